@@ -1,11 +1,26 @@
 # app.py
-import json
 from datetime import datetime, timedelta
 
+import altair as alt
 import pandas as pd
 import requests
 import streamlit as st
 
+from habit_state import (
+    RANGE_OPTIONS,
+    build_rollups,
+    build_share_payload,
+    build_share_text,
+    clear_state,
+    compact_music,
+    evict_stale_state,
+    pick_resolution,
+    save_history_row,
+    series_frame,
+    state_size,
+    touch_state,
+)
+
 # -----------------------------
 # Page Config
 # -----------------------------
@@ -61,6 +76,11 @@ COACH_STYLES = {
     "게임 마스터": "RPG 퀘스트/레벨업 톤으로 재미있게 이끄는 게임 마스터",
 }
 
+# 장기 기록 히트맵 (보관 기간/해상도 상한은 habit_state 참고)
+HEATMAP_MAX_DAYS = 371  # 53주
+RESOLUTION_LABELS = {"D": "일별", "W": "주별", "M": "월별"}
+WEEKDAY_LABELS = ["월", "화", "수", "목", "금", "토", "일"]
+
 # -----------------------------
 # Session State Init
 # -----------------------------
@@ -85,12 +105,14 @@ def _init_demo_history():
 
 if "history" not in st.session_state:
     st.session_state["history"] = _init_demo_history()
-if "latest_report" not in st.session_state:
-    st.session_state["latest_report"] = None
-if "latest_share_text" not in st.session_state:
-    st.session_state["latest_share_text"] = None
+if "latest_share" not in st.session_state:
+    st.session_state["latest_share"] = None  # 공유 payload (리포트 포함, 텍스트는 표시할 때 생성)
 if "latest_music" not in st.session_state:
-    st.session_state["latest_music"] = None  # 추천 목록 저장
+    st.session_state["latest_music"] = None  # 추천 목록 저장 (compact)
+if "state_saved_at" not in st.session_state:
+    st.session_state["state_saved_at"] = {}
+
+evict_stale_state(st.session_state)
 
 # -----------------------------
 # API Helpers
@@ -461,6 +483,63 @@ df["date"] = pd.to_datetime(df["date"])
 df = df.sort_values("date")
 st.bar_chart(df.set_index("date")[["rate"]])
 
+# -----------------------------
+# Long-range Heatmap / Trend (일별=history, 주/월=rollups)
+# -----------------------------
+st.subheader("📅 장기 기록 (히트맵/추이)")
+
+if "rollups" not in st.session_state:
+    st.session_state["rollups"] = build_rollups(st.session_state["history"])
+
+# 저장된 오늘 기록 대신 현재 체크 상태(live_row)를 반영
+live_row = chart_rows[-1]
+
+range_label = st.radio("기간", list(RANGE_OPTIONS.keys()), index=2, horizontal=True)
+range_days = RANGE_OPTIONS[range_label]
+range_start = (datetime.now().date() - timedelta(days=range_days - 1)).isoformat()
+resolution = pick_resolution(range_days)
+
+heat_col, trend_col = st.columns([1.4, 1])
+
+with heat_col:
+    if range_days <= HEATMAP_MAX_DAYS:
+        # 주(열) x 요일(행) 달력 히트맵
+        heat_df = series_frame(st.session_state["history"], st.session_state["rollups"], "D", range_start, live_row)
+        heat_df["col"] = (heat_df["date"] - pd.to_timedelta(heat_df["date"].dt.weekday, unit="D")).dt.strftime("%Y-%m-%d")
+        heat_df["row"] = heat_df["date"].dt.weekday.map(lambda i: WEEKDAY_LABELS[i])
+        col_sort, row_sort = None, WEEKDAY_LABELS
+        # 열(주 시작일)은 그 달의 첫 주에만 "N월" 라벨 표시
+        col_label_expr = "toNumber(substring(datum.value, 8, 10)) <= 7 ? toNumber(substring(datum.value, 5, 7)) + '월' : ''"
+    else:
+        # 긴 기간은 월(열) x 연도(행) 히트맵
+        heat_df = series_frame(st.session_state["history"], st.session_state["rollups"], "M", range_start, live_row)
+        heat_df["col"] = heat_df["date"].dt.month.astype(str) + "월"
+        heat_df["row"] = heat_df["date"].dt.year.astype(str)
+        col_sort, row_sort = [f"{m}월" for m in range(1, 13)], None
+        col_label_expr = "datum.value"
+
+    if heat_df.empty:
+        st.caption("표시할 기록이 없어요.")
+    else:
+        heat_df["label"] = heat_df["date"].dt.strftime("%Y-%m-%d")
+        heatmap = (
+            alt.Chart(heat_df[["col", "row", "label", "rate", "mood"]])
+            .mark_rect()
+            .encode(
+                x=alt.X("col:O", title=None, sort=col_sort, axis=alt.Axis(labelExpr=col_label_expr, labelAngle=0, ticks=False)),
+                y=alt.Y("row:O", title=None, sort=row_sort),
+                color=alt.Color("rate:Q", title="달성률(%)", scale=alt.Scale(domain=[0, 100], scheme="greens")),
+                tooltip=["label", "rate", "mood"],
+            )
+        )
+        st.altair_chart(heatmap, use_container_width=True)
+
+with trend_col:
+    trend_df = series_frame(st.session_state["history"], st.session_state["rollups"], resolution, range_start, live_row)
+    st.caption(f"{RESOLUTION_LABELS[resolution]} 평균 · {len(trend_df)}개 구간")
+    if not trend_df.empty:
+        st.line_chart(trend_df.set_index("date")[["rate"]])
+
 # -----------------------------
 # Music Recommendation (YouTube)
 # -----------------------------
@@ -485,10 +564,10 @@ if music_btn:
     if music_err:
         st.warning("음악 추천을 가져오지 못했어요.")
         st.caption(f"원인: {music_err}")
-        st.session_state["latest_music"] = None
+        clear_state(st.session_state, "latest_music")
     else:
         st.success("음악 추천 완료!")
-        st.session_state["latest_music"] = music_list
+        touch_state(st.session_state, "latest_music", compact_music(music_list))
 
 # 표시 (최근 추천 유지)
 music_list_to_show = st.session_state.get("latest_music")
@@ -523,10 +602,10 @@ if btn:
         "rate": float(rate_pct),
         "mood": mood,
     }
-    hist = [r for r in st.session_state["history"] if r.get("date") != today_iso]
-    hist.append(new_row)
-    hist = sorted(hist, key=lambda x: x["date"])[-14:]
-    st.session_state["history"] = hist
+    # history 저장 + 주/월 집계 증분 갱신 (보관 기간 밖 기록은 둘 다에서 제거)
+    st.session_state["history"] = save_history_row(
+        st.session_state["history"], st.session_state["rollups"], new_row
+    )
 
     # Fetch APIs
     weather, weather_err = get_weather(city_query, owm_api_key)
@@ -539,8 +618,9 @@ if btn:
         music_list, music_auto_err = get_youtube_music_recommendations(
             mood=mood, api_key=yt_api_key, weather=weather, max_results=5
         )
+        music_list = compact_music(music_list)
         if music_list:
-            st.session_state["latest_music"] = music_list
+            touch_state(st.session_state, "latest_music", music_list)
 
     # Generate AI report
     with st.spinner("AI 코치가 리포트를 작성 중..."):
@@ -609,44 +689,36 @@ if btn:
         st.write(report)
 
     # Share text
-    share_payload = {
-        "date": today_iso,
-        "city": city_label,
-        "city_query": city_query,
-        "coach_style": coach_style,
-        "rate_percent": rate_pct,
-        "achieved": f"{achieved_cnt}/5",
-        "mood": mood,
-        "weather": weather,
-        "weather_error": weather_err,
-        "dog": dog,
-        "music": (music_list[:5] if music_list else None),
-        "report": report,
-    }
-    share_text = (
-        f"[AI 습관 트래커 공유]\n"
-        f"- 날짜: {today_iso}\n"
-        f"- 도시: {city_label} ({city_query})\n"
-        f"- 코치: {coach_style}\n"
-        f"- 달성률: {rate_pct}% ({achieved_cnt}/5)\n"
-        f"- 기분: {mood}/10\n\n"
-        f"[음악 추천]\n"
-        + (
-            "\n".join([f"- {m['title']} ({m.get('channel','')}) {m['video_url']}" for m in (music_list[:3] if music_list else [])])
-            if music_list
-            else "(없음)"
-        )
-        + "\n\n"
-        f"[리포트]\n{report or '(리포트 없음)'}\n\n"
-        f"[원본 데이터(JSON)]\n{json.dumps(share_payload, ensure_ascii=False, indent=2)}"
+    share_payload = build_share_payload(
+        date_iso=today_iso,
+        city_label=city_label,
+        city_query=city_query,
+        coach_style=coach_style,
+        rate_pct=rate_pct,
+        achieved_cnt=achieved_cnt,
+        mood=mood,
+        weather=weather,
+        weather_err=weather_err,
+        dog=dog,
+        music_list=music_list,
+        report=report,
     )
-    st.session_state["latest_report"] = report
-    st.session_state["latest_share_text"] = share_text
+    touch_state(st.session_state, "latest_share", share_payload)
 
-# If already generated earlier, show share text
-if st.session_state.get("latest_share_text"):
+# If already generated earlier, show share text (요청할 때만 payload에서 생성)
+if st.session_state.get("latest_share"):
     st.markdown("### 🔗 공유용 텍스트")
-    st.code(st.session_state["latest_share_text"], language="text")
+    if st.checkbox("공유 텍스트 보기", value=False, key="show_share_text"):
+        st.code(build_share_text(st.session_state["latest_share"]), language="text")
+
+with st.sidebar:
+    st.divider()
+    # 세션 전체를 직렬화하므로 켰을 때만 측정 (부하 측정은 scripts/session_state_load.py)
+    if st.checkbox("🧮 세션 메모리 보기", value=False, key="show_state_size"):
+        state_sizes = state_size(st.session_state)
+        st.caption(f"합계(위젯 포함 전체 키): {sum(state_sizes.values()):,} bytes")
+        for key, size in sorted(state_sizes.items(), key=lambda kv: -kv[1]):
+            st.caption(f"- {key}: {size:,} bytes")
 
 # -----------------------------
 # Footer: API 안내
@@ -0,0 +1,239 @@
+# habit_state.py
+"""
+세션 상태용 순수 헬퍼 (Streamlit 의존 없음)
+- app.py와 scripts/ 부하 측정 스크립트가 함께 사용
+"""
+import json
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+# 세션에 저장하는 음악 추천 필드 (thumbnail 등은 저장하지 않음)
+MUSIC_FIELDS = ("title", "channel", "video_url", "query_hint")
+
+# 음악/리포트는 오래되면 세션에서 제거 (동시 세션이 많을 때 메모리 절약)
+STATE_TTL = timedelta(hours=6)
+EVICTABLE_STATE_KEYS = ("latest_music", "latest_share")
+
+
+# -----------------------------
+# Session State (touch / evict / size)
+# -----------------------------
+def compact_music(music_list: list | None):
+    """음악 추천 목록에서 화면/공유에 쓰는 필드만 남김 (썸네일 등 제거, 빈 값도 키는 유지)"""
+    if not music_list:
+        return None
+    return [{k: m.get(k) for k in MUSIC_FIELDS} for m in music_list[:5]]
+
+
+def touch_state(state, key: str, value, now: datetime | None = None):
+    """세션 값 저장 + 저장 시각 기록 (만료 판단용)"""
+    now = now or datetime.now()
+    state[key] = value
+    state["state_saved_at"][key] = now.isoformat()
+
+
+def clear_state(state, key: str):
+    """세션 값 비우기 + 저장 시각도 제거"""
+    state[key] = None
+    state["state_saved_at"].pop(key, None)
+
+
+def evict_stale_state(state, now: datetime | None = None):
+    """STATE_TTL보다 오래됐거나 날짜가 바뀐 음악/리포트 데이터 제거"""
+    now = now or datetime.now()
+    saved_at = state["state_saved_at"]
+    for key in EVICTABLE_STATE_KEYS:
+        ts = saved_at.get(key)
+        if not ts:
+            continue
+        t = datetime.fromisoformat(ts)
+        if now - t > STATE_TTL or t.date() != now.date():
+            clear_state(state, key)
+
+
+def state_size(state):
+    """
+    세션 키별 직렬화 크기(bytes) 추정 - JSON(UTF-8) 기준
+    - state의 모든 키(위젯 키 포함)를 측정
+    """
+    sizes = {}
+    for key in list(state.keys()):
+        value = state.get(key)
+        sizes[key] = len(json.dumps(value, ensure_ascii=False, default=str).encode("utf-8"))
+    return sizes
+
+
+# -----------------------------
+# Share Payload / Text
+# -----------------------------
+def build_share_payload(
+    date_iso: str,
+    city_label: str,
+    city_query: str,
+    coach_style: str,
+    rate_pct: float,
+    achieved_cnt: int,
+    mood: int,
+    weather: dict | None,
+    weather_err: str | None,
+    dog: dict | None,
+    music_list: list | None,
+    report: str | None,
+):
+    """세션에 한 번만 저장하는 공유 payload (리포트 포함)"""
+    return {
+        "date": date_iso,
+        "city": city_label,
+        "city_query": city_query,
+        "coach_style": coach_style,
+        "rate_percent": rate_pct,
+        "achieved": f"{achieved_cnt}/5",
+        "mood": mood,
+        "weather": weather,
+        "weather_error": weather_err,
+        "dog": dog,
+        "music": (music_list[:5] if music_list else None),
+        "report": report,
+    }
+
+
+def build_share_text(payload: dict) -> str:
+    """공유 payload로 공유용 텍스트 생성 (세션에는 텍스트를 저장하지 않음)"""
+    music_list = payload.get("music")
+    report = payload.get("report")
+    return (
+        f"[AI 습관 트래커 공유]\n"
+        f"- 날짜: {payload.get('date')}\n"
+        f"- 도시: {payload.get('city')} ({payload.get('city_query')})\n"
+        f"- 코치: {payload.get('coach_style')}\n"
+        f"- 달성률: {payload.get('rate_percent')}% ({payload.get('achieved')})\n"
+        f"- 기분: {payload.get('mood')}/10\n\n"
+        f"[음악 추천]\n"
+        + (
+            "\n".join([f"- {m['title']} ({m.get('channel','')}) {m['video_url']}" for m in music_list[:3]])
+            if music_list
+            else "(없음)"
+        )
+        + "\n\n"
+        f"[리포트]\n{report or '(리포트 없음)'}\n\n"
+        f"[원본 데이터(JSON)]\n{json.dumps(payload, ensure_ascii=False, indent=2)}"
+    )
+
+
+# -----------------------------
+# Long-range History / Rollups (주/월 집계)
+# -----------------------------
+# 일별 데이터는 history 하나만 보관하고, 주/월은 history에서 증분 집계
+HISTORY_MAX_DAYS = 730
+MAX_CHART_POINTS = 120
+RANGE_OPTIONS = {"30일": 30, "90일": 90, "1년": 365, "2년": 730}
+ROLLUP_RESOLUTIONS = ("W", "M")
+
+
+def _bucket_keys(date_iso: str):
+    """날짜 → 주(월요일)/월(1일) 집계 키"""
+    d = datetime.fromisoformat(date_iso).date()
+    return {
+        "W": (d - timedelta(days=d.weekday())).isoformat(),
+        "M": d.replace(day=1).isoformat(),
+    }
+
+
+def _rollup_apply(rollups: dict, row: dict, sign: int):
+    """기록 1건을 집계에 더하거나(sign=1) 뺌(sign=-1). 버킷은 새 dict로 교체(복사본 공유 안전)"""
+    for res, key in _bucket_keys(row["date"]).items():
+        if res not in rollups:
+            continue
+        table = rollups[res]
+        b = dict(table.get(key) or {"n": 0, "rate": 0.0, "achieved": 0, "mood": 0})
+        b["n"] += sign
+        b["rate"] += sign * float(row["rate"])
+        b["achieved"] += sign * row["achieved"]
+        b["mood"] += sign * row["mood"]
+        if b["n"] <= 0:
+            table.pop(key, None)
+        else:
+            table[key] = b
+
+
+def rollup_replace(rollups: dict, old_row: dict | None, new_row: dict | None):
+    """같은 날짜 기록이 바뀌었을 때 증분 갱신 (old 빼고 new 더함)"""
+    if old_row:
+        _rollup_apply(rollups, old_row, -1)
+    if new_row:
+        _rollup_apply(rollups, new_row, 1)
+
+
+def build_rollups(history: list):
+    rollups = {res: {} for res in ROLLUP_RESOLUTIONS}
+    for row in history:
+        _rollup_apply(rollups, row, 1)
+    return rollups
+
+
+def save_history_row(history: list, rollups: dict, new_row: dict):
+    """
+    history에 하루 기록을 저장(같은 날짜면 교체)하고 rollups도 같이 증분 갱신
+    - HISTORY_MAX_DAYS를 넘는 오래된 기록은 history/rollups 모두에서 제거
+    - 새 history 반환 (rollups는 제자리 갱신)
+    """
+    old_row = next((r for r in history if r.get("date") == new_row["date"]), None)
+    hist = [r for r in history if r.get("date") != new_row["date"]]
+    hist.append(new_row)
+    hist = sorted(hist, key=lambda x: x["date"])
+    dropped, hist = hist[:-HISTORY_MAX_DAYS], hist[-HISTORY_MAX_DAYS:]
+
+    rollup_replace(rollups, old_row, new_row)
+    for r in dropped:
+        rollup_replace(rollups, r, None)
+    return hist
+
+
+def pick_resolution(days: int) -> str:
+    """차트 포인트가 MAX_CHART_POINTS를 넘지 않는 가장 세밀한 해상도 (D/W/M)"""
+    if days <= MAX_CHART_POINTS:
+        return "D"
+    if days / 7 <= MAX_CHART_POINTS:
+        return "W"
+    return "M"
+
+
+def series_frame(history: list, rollups: dict, res: str, start_iso: str, live_row: dict | None = None):
+    """
+    기간/해상도별 평균 DataFrame (start 이후만)
+    - D: history 행을 그대로 사용, W/M: rollups 사용
+    - W/M은 start 이후에 시작하는 버킷만 (start 이전 날짜가 섞인 첫 버킷은 제외)
+    - live_row: 아직 저장 안 된 오늘 기록 (저장된 같은 날짜 기록 대신 반영)
+    """
+    if res == "D":
+        rows = [
+            dict(r, days=1)
+            for r in history
+            if r["date"] >= start_iso and not (live_row and r["date"] == live_row["date"])
+        ]
+        if live_row and live_row["date"] >= start_iso:
+            rows.append(dict(live_row, days=1))
+    else:
+        table = rollups[res]
+        if live_row:
+            # res 테이블만 얕은 복사 후 오늘 버킷 교체
+            saved = next((r for r in history if r.get("date") == live_row["date"]), None)
+            view = {res: dict(table)}
+            rollup_replace(view, saved, live_row)
+            table = view[res]
+        rows = [
+            {
+                "date": key,
+                "rate": round(b["rate"] / b["n"], 1),
+                "achieved": round(b["achieved"] / b["n"], 2),
+                "mood": round(b["mood"] / b["n"], 1),
+                "days": b["n"],
+            }
+            for key, b in table.items()
+            if key >= start_iso
+        ]
+
+    df = pd.DataFrame(rows, columns=["date", "rate", "achieved", "mood", "days"])
+    df["date"] = pd.to_datetime(df["date"])
+    return df.sort_values("date").reset_index(drop=True)
@@ -0,0 +1,119 @@
+# scripts/session_state_load.py
+"""
+세션 상태 부하 측정: N개의 가상 세션 상태를 만들고 세션당 bytes(min/mean/max)와 합계 출력
+
+사용법:
+    python scripts/session_state_load.py --sessions 5000 --days 730
+"""
+import argparse
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from habit_state import (  # noqa: E402
+    build_rollups,
+    build_share_payload,
+    compact_music,
+    state_size,
+    touch_state,
+)
+
+
+def _synthetic_history(rng: random.Random, today, days: int):
+    rows = []
+    for i in range(days - 1, -1, -1):
+        achieved = rng.randint(0, 5)
+        rows.append(
+            {
+                "date": (today - timedelta(days=i)).isoformat(),
+                "achieved": achieved,
+                "rate": round(achieved / 5 * 100, 1),
+                "mood": rng.randint(1, 10),
+            }
+        )
+    return rows
+
+
+def _synthetic_music(rng: random.Random):
+    """YouTube 검색 결과 형태(썸네일 포함) 5개"""
+    items = []
+    for i in range(5):
+        vid = "".join(rng.choice("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_-") for _ in range(11))
+        items.append(
+            {
+                "title": f"비 오는 날 감성 플레이리스트 | 잔잔한 피아노 모음 {i + 1}",
+                "channel": "Lofi Cafe 채널",
+                "video_url": f"https://www.youtube.com/watch?v={vid}",
+                "thumbnail": f"https://i.ytimg.com/vi/{vid}/hqdefault.jpg",
+                "query_hint": "비 오는 날 힐링 피아노 음악",
+            }
+        )
+    return items
+
+
+def build_session_state(rng: random.Random, now: datetime, days: int):
+    """app.py와 같은 헬퍼로 리포트까지 생성된 세션 1개의 상태 구성"""
+    today = now.date()
+    state = {"state_saved_at": {}}
+    state["history"] = _synthetic_history(rng, today, days)
+    state["rollups"] = build_rollups(state["history"])
+
+    music_list = compact_music(_synthetic_music(rng))
+    touch_state(state, "latest_music", music_list, now=now)
+
+    last = state["history"][-1]
+    share_payload = build_share_payload(
+        date_iso=today.isoformat(),
+        city_label="Seoul",
+        city_query="Seoul,KR",
+        coach_style="따뜻한 멘토",
+        rate_pct=last["rate"],
+        achieved_cnt=last["achieved"],
+        mood=last["mood"],
+        weather={
+            "city": "Seoul,KR",
+            "description": "튼구름",
+            "temp_c": 18.3,
+            "feels_like_c": 17.9,
+            "humidity": 62,
+            "wind_ms": 2.1,
+        },
+        weather_err=None,
+        dog={"image_url": "https://images.dog.ceo/breeds/retriever-golden/n02099601_1234.jpg", "breed": "Golden Retriever"},
+        music_list=music_list,
+        report="컨디션 등급: B\n습관 분석: " + "꾸준함이 보여요. " * 20 + "\n내일 미션:\n- 물 2L\n- 30분 독서\n- 11시 취침",
+    )
+    touch_state(state, "latest_share", share_payload, now=now)
+    return state
+
+
+def main():
+    parser = argparse.ArgumentParser(description="세션 상태 크기 부하 측정")
+    parser.add_argument("--sessions", type=int, default=1000, help="가상 세션 수")
+    parser.add_argument("--days", type=int, default=730, help="세션당 history 일수")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    now = datetime.now()
+    per_session = []
+    per_key = {}
+    for _ in range(args.sessions):
+        sizes = state_size(build_session_state(rng, now, args.days))
+        per_session.append(sum(sizes.values()))
+        for key, size in sizes.items():
+            per_key[key] = per_key.get(key, 0) + size
+
+    total = sum(per_session)
+    print(f"sessions: {args.sessions:,}  history days: {args.days}")
+    print(f"bytes/session  min: {min(per_session):,}  mean: {total / len(per_session):,.0f}  max: {max(per_session):,}")
+    print(f"total: {total:,} bytes ({total / 1024 / 1024:.1f} MiB)")
+    for key, size in sorted(per_key.items(), key=lambda kv: -kv[1]):
+        print(f"  {key}: mean {size / args.sessions:,.0f} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+import os
+import random
+import sys
+from datetime import date, datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from habit_state import (  # noqa: E402
+    HISTORY_MAX_DAYS,
+    MAX_CHART_POINTS,
+    RANGE_OPTIONS,
+    STATE_TTL,
+    build_rollups,
+    build_share_payload,
+    build_share_text,
+    clear_state,
+    compact_music,
+    evict_stale_state,
+    pick_resolution,
+    rollup_replace,
+    save_history_row,
+    series_frame,
+    touch_state,
+)
+
+
+def _state():
+    return {"latest_music": None, "latest_share": None, "state_saved_at": {}}
+
+
+def _music():
+    return [
+        {
+            "title": f"Song {i}",
+            "channel": "Chan",
+            "video_url": f"https://www.youtube.com/watch?v=v{i}",
+            "thumbnail": f"https://i.ytimg.com/vi/v{i}/hqdefault.jpg",
+            "query_hint": "힐링 피아노 음악",
+        }
+        for i in range(6)
+    ]
+
+
+def test_evict_after_ttl():
+    saved = datetime(2026, 10, 19, 8, 0)
+    state = _state()
+    touch_state(state, "latest_music", compact_music(_music()), now=saved)
+
+    evict_stale_state(state, now=saved + STATE_TTL + timedelta(minutes=1))
+
+    assert state["latest_music"] is None
+    assert "latest_music" not in state["state_saved_at"]
+
+
+def test_evict_on_date_change():
+    saved = datetime(2026, 10, 19, 23, 30)
+    state = _state()
+    touch_state(state, "latest_share", {"report": "r"}, now=saved)
+
+    evict_stale_state(state, now=saved + timedelta(hours=1))
+
+    assert state["latest_share"] is None
+    assert state["state_saved_at"] == {}
+
+
+def test_fresh_state_not_evicted():
+    saved = datetime(2026, 10, 19, 8, 0)
+    state = _state()
+    touch_state(state, "latest_music", compact_music(_music()), now=saved)
+    touch_state(state, "latest_share", {"report": "r"}, now=saved)
+
+    evict_stale_state(state, now=saved + STATE_TTL - timedelta(minutes=1))
+
+    assert len(state["latest_music"]) == 5
+    assert state["latest_share"] == {"report": "r"}
+    assert set(state["state_saved_at"]) == {"latest_music", "latest_share"}
+
+
+def test_clear_state_drops_timestamp():
+    state = _state()
+    touch_state(state, "latest_music", compact_music(_music()))
+
+    clear_state(state, "latest_music")
+
+    assert state["latest_music"] is None
+    assert "latest_music" not in state["state_saved_at"]
+
+
+def test_compact_music_keeps_empty_fields():
+    music = compact_music([{"title": "", "channel": "", "video_url": "u", "thumbnail": "t"}])
+
+    assert music == [{"title": "", "channel": "", "video_url": "u", "query_hint": None}]
+    assert "[음악 추천]\n-  () u\n" in build_share_text({"music": music})
+
+
+def test_share_text_sections():
+    music = compact_music(_music())
+    payload = build_share_payload(
+        date_iso="2026-10-19",
+        city_label="Seoul",
+        city_query="Seoul,KR",
+        coach_style="따뜻한 멘토",
+        rate_pct=60.0,
+        achieved_cnt=3,
+        mood=7,
+        weather=None,
+        weather_err="HTTP 401: Invalid API key",
+        dog=None,
+        music_list=music,
+        report="컨디션 등급: B",
+    )
+
+    text = build_share_text(payload)
+
+    assert text.startswith(
+        "[AI 습관 트래커 공유]\n"
+        "- 날짜: 2026-10-19\n"
+        "- 도시: Seoul (Seoul,KR)\n"
+        "- 코치: 따뜻한 멘토\n"
+        "- 달성률: 60.0% (3/5)\n"
+        "- 기분: 7/10\n\n"
+    )
+    assert "[음악 추천]\n- Song 0 (Chan) https://www.youtube.com/watch?v=v0\n" in text
+    assert "- Song 2 (Chan)" in text and "- Song 3 (Chan)" not in text
+    assert "[리포트]\n컨디션 등급: B\n\n" in text
+    assert '"weather_error": "HTTP 401: Invalid API key"' in text
+    assert "thumbnail" not in text
+
+
+def test_share_text_without_music_or_report():
+    text = build_share_text({"date": "2026-10-19", "music": None, "report": None})
+
+    assert "[음악 추천]\n(없음)\n\n" in text
+    assert "[리포트]\n(리포트 없음)" in text
+
+
+def _row(d: date, achieved: int, mood: int = 5):
+    return {"date": d.isoformat(), "achieved": achieved, "rate": round(achieved / 5 * 100, 1), "mood": mood}
+
+
+def _history(end: date, days: int, seed: int = 0):
+    rng = random.Random(seed)
+    return [_row(end - timedelta(days=i), rng.randint(0, 5), rng.randint(1, 10)) for i in range(days - 1, -1, -1)]
+
+
+def _assert_rollups_equal(actual, expected):
+    assert actual.keys() == expected.keys()
+    for res in expected:
+        assert actual[res].keys() == expected[res].keys()
+        for key, b in expected[res].items():
+            assert actual[res][key]["n"] == b["n"]
+            assert actual[res][key]["achieved"] == b["achieved"]
+            assert actual[res][key]["mood"] == b["mood"]
+            assert actual[res][key]["rate"] == pytest.approx(b["rate"])
+
+
+def test_replace_today_matches_full_rebuild():
+    today = date(2026, 10, 19)
+    history = _history(today, 40)
+    rollups = build_rollups(history)
+
+    for achieved in (0, 5, 3):
+        history = save_history_row(history, rollups, _row(today, achieved, mood=9))
+
+    assert sum(1 for r in history if r["date"] == today.isoformat()) == 1
+    _assert_rollups_equal(rollups, build_rollups(history))
+
+
+def test_aged_out_rows_dropped_from_rollups():
+    start = date(2024, 1, 1)
+    history = _history(start + timedelta(days=HISTORY_MAX_DAYS - 1), HISTORY_MAX_DAYS)
+    rollups = build_rollups(history)
+
+    for i in range(1, 45):
+        history = save_history_row(history, rollups, _row(start + timedelta(days=HISTORY_MAX_DAYS - 1 + i), i % 6))
+
+    assert len(history) == HISTORY_MAX_DAYS
+    assert history[0]["date"] == (start + timedelta(days=44)).isoformat()
+    _assert_rollups_equal(rollups, build_rollups(history))
+
+
+def test_rollup_replace_does_not_mutate_shared_buckets():
+    today = date(2026, 10, 19)
+    history = _history(today, 10)
+    rollups = build_rollups(history)
+    view = {res: dict(table) for res, table in rollups.items()}
+
+    rollup_replace(view, history[-1], _row(today, 5, mood=10))
+
+    _assert_rollups_equal(rollups, build_rollups(history))
+
+
+@pytest.mark.parametrize("label,days", list(RANGE_OPTIONS.items()))
+def test_pick_resolution_bounds_points(label, days):
+    today = date(2026, 10, 19)
+    history = _history(today, HISTORY_MAX_DAYS)
+    rollups = build_rollups(history)
+    start_iso = (today - timedelta(days=days - 1)).isoformat()
+
+    res = pick_resolution(days)
+    df = series_frame(history, rollups, res, start_iso, live_row=_row(today, 2))
+
+    assert len(df) <= MAX_CHART_POINTS
+
+
+@pytest.mark.parametrize("res,start_iso", [("W", "2025-10-19"), ("M", "2024-10-20"), ("W", "2025-10-20"), ("M", "2024-11-01")])
+def test_series_frame_buckets_within_range(res, start_iso):
+    today = date(2026, 10, 19)
+    history = _history(today, HISTORY_MAX_DAYS)
+    rollups = build_rollups(history)
+    in_range = [r for r in history if r["date"] >= start_iso]
+
+    df = series_frame(history, rollups, res, start_iso, live_row=_row(today, 2))
+
+    assert df["date"].min().date().isoformat() >= start_iso
+    # 포함된 버킷은 모두 기간 안의 날짜만 집계 (부분 버킷 없음)
+    covered = sum(1 for r in in_range if r["date"] >= df["date"].min().date().isoformat())
+    assert df["days"].sum() == covered
+
+
+def test_series_frame_uses_live_row():
+    today = date(2026, 10, 19)
+    history = _history(today, 14)
+    rollups = build_rollups(history)
+    live = _row(today, 5, mood=10)
+    start_iso = (today - timedelta(days=13)).isoformat()
+
+    daily = series_frame(history, rollups, "D", start_iso, live_row=live)
+    assert len(daily) == 14
+    assert daily.iloc[-1]["rate"] == 100.0
+
+    history_live = [r for r in history if r["date"] != today.isoformat()] + [live]
+    weekly = series_frame(history, rollups, "W", start_iso, live_row=live)
+    expected = series_frame(history_live, build_rollups(history_live), "W", start_iso)
+    assert weekly["rate"].tolist() == expected["rate"].tolist()